@@ -3,6 +3,7 @@ Configuration file for Jenna The Temp - Multi-Platform Video Downloader
 """
 
 import os
+import json
 
 class Config:
     """Base configuration"""
@@ -16,16 +17,56 @@ class Config:
     # Directory settings
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'downloads')
     SUBTITLE_FOLDER = os.environ.get('SUBTITLE_FOLDER', 'subtitles')
+    PROFILE_FOLDER = os.environ.get('PROFILE_FOLDER', 'profiles')
+    # Partial uploads are kept here until complete
+    UPLOAD_TEMP_FOLDER = os.environ.get('UPLOAD_TEMP_FOLDER', 'uploads_tmp')
+    # Unfinished uploads are removed after this many hours without new data
+    UPLOAD_TEMP_TTL_HOURS = float(os.environ.get('UPLOAD_TEMP_TTL_HOURS', 24))
+    
+    # Debug settings
+    # When enabled, a /download request with "profile": true is run under cProfile
+    ENABLE_PROFILING = os.environ.get('ENABLE_PROFILING', 'False').lower() == 'true'
     
     # Download settings
     MAX_LINKS_PER_REQUEST = int(os.environ.get('MAX_LINKS_PER_REQUEST', 10))
     MAX_FILE_SIZE_MB = int(os.environ.get('MAX_FILE_SIZE_MB', 500))
+    # Media types accepted by the upload endpoints
+    UPLOAD_EXTENSIONS = ['.mp4', '.mov', '.mkv', '.webm', '.mp3', '.m4a', '.wav', '.ogg', '.flac']
+    
+    # Playlist/channel links are expanded into at most this many videos
+    MAX_PLAYLIST_ITEMS = int(os.environ.get('MAX_PLAYLIST_ITEMS', 50))
+    # Videos already listed here are skipped when a playlist is downloaded again
+    DOWNLOAD_ARCHIVE_FILE = os.environ.get('DOWNLOAD_ARCHIVE_FILE', 'download_archive.txt')
+    # Idle yt-dlp sessions kept per domain and format for connection reuse
+    YTDL_POOL_SIZE = int(os.environ.get('YTDL_POOL_SIZE', 4))
+    
+    # Runtime settings file, watched and applied without a restart
+    RUNTIME_CONFIG_FILE = os.environ.get('RUNTIME_CONFIG_FILE', 'runtime_config.json')
+    RUNTIME_CONFIG_POLL_SECONDS = float(os.environ.get('RUNTIME_CONFIG_POLL_SECONDS', 2))
+    # Token required by /admin endpoints (leave unset to allow local use without one)
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
     
     # Whisper model settings
     WHISPER_MODEL = os.environ.get('WHISPER_MODEL', 'base')
     # Available models: tiny, base, small, medium, large
     # Larger models are more accurate but slower and use more memory
     
+    # Model used to detect the language on the first 30 seconds (must be multilingual, not *.en)
+    LANGUAGE_ID_MODEL = os.environ.get('LANGUAGE_ID_MODEL', 'tiny')
+    # Model routing by detected language and duration (seconds); the first matching
+    # route wins and WHISPER_MODEL is used when none match (no routes by default), e.g.
+    # [{"language": "en", "max_duration": 180, "model": "tiny.en"}]
+    WHISPER_MODEL_ROUTES = json.loads(os.environ.get('WHISPER_MODEL_ROUTES', '[]'))
+    # Skip transcription when the first 30 seconds are likely not speech (e.g. music only)
+    SKIP_NON_SPEECH = os.environ.get('SKIP_NON_SPEECH', 'False').lower() == 'true'
+    NO_SPEECH_THRESHOLD = float(os.environ.get('NO_SPEECH_THRESHOLD', 0.8))
+    
+    # Transcript streaming settings
+    # Transcripts without timestamps are streamed in chunks of at most this many characters
+    SEGMENT_MAX_CHARS = int(os.environ.get('SEGMENT_MAX_CHARS', 1000))
+    # Segments are translated in batches of up to this many characters per request
+    TRANSLATE_BATCH_CHARS = int(os.environ.get('TRANSLATE_BATCH_CHARS', 2000))
+    
     # Video quality settings
     VIDEO_QUALITY = os.environ.get('VIDEO_QUALITY', 'best[height<=1080]')
     AUDIO_QUALITY = os.environ.get('AUDIO_QUALITY', 'bestaudio[ext=m4a]')
@@ -52,6 +93,15 @@ class Config:
         'fb.watch'
     ]
     
+    # Links matching these patterns are playlists or channels
+    PLAYLIST_URL_PATTERNS = [
+        r'youtube\.com/playlist\?',
+        r'youtube\.com/.*[?&]list=',
+        r'youtube\.com/(channel|c|user)/',
+        r'youtube\.com/@[^/?]+/?(\?|$|(videos|shorts|streams)\b)',
+        r'tiktok\.com/@[^/?]+/?(\?|$)'
+    ]
+    
     # Platform name mapping
     PLATFORM_NAMES = {
         'Youtube': 'YT',
@@ -81,4 +131,125 @@ config = {
 def get_config():
     """Get configuration based on environment"""
     env = os.environ.get('FLASK_ENV', 'development')
-    return config.get(env, config['default'])
\ No newline at end of file
+    return config.get(env, config['default'])
+
+# Settings that can be changed at runtime through RUNTIME_CONFIG_FILE
+RELOADABLE_SETTINGS = [
+    'VIDEO_QUALITY',
+    'AUDIO_QUALITY',
+    'WHISPER_MODEL',
+    'WHISPER_MODEL_ROUTES',
+    'SKIP_NON_SPEECH',
+    'NO_SPEECH_THRESHOLD',
+    'MAX_LINKS_PER_REQUEST',
+    'MAX_PLAYLIST_ITEMS',
+    'YTDL_POOL_SIZE',
+    'USER_AGENT',
+    'COOKIE_FILES'
+]
+
+# Reloadable counts and sizes that must be at least 1
+POSITIVE_INT_SETTINGS = [
+    'MAX_LINKS_PER_REQUEST',
+    'MAX_PLAYLIST_ITEMS',
+    'YTDL_POOL_SIZE'
+]
+
+def read_runtime_overrides(config_class):
+    """Read the raw overrides stored in the runtime config file (empty if none)"""
+    path = config_class.RUNTIME_CONFIG_FILE
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def parse_runtime_setting(key, value, default):
+    """Parse an override to the type of its default (e.g. "5" -> 5)
+
+    Raises ValueError when the value can't be used for the setting.
+    """
+    if value is None:
+        raise ValueError(f"Setting cannot be null: {key}")
+    
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ('true', 'false'):
+            return value.lower() == 'true'
+        raise ValueError(f"Setting {key} must be true or false")
+    
+    if isinstance(default, (list, dict)):
+        if not isinstance(value, type(default)):
+            raise ValueError(f"Setting {key} must be a {type(default).__name__}")
+        return value
+    
+    if isinstance(default, int):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"Setting {key} must be a whole number")
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f"Setting {key} must be a whole number")
+        if key in POSITIVE_INT_SETTINGS and value < 1:
+            raise ValueError(f"Setting {key} must be at least 1")
+        return value
+    
+    if isinstance(default, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"Setting {key} must be a number")
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"Setting {key} must be a number")
+        if key == 'NO_SPEECH_THRESHOLD' and not 0 <= value <= 1:
+            raise ValueError(f"Setting {key} must be between 0 and 1")
+        return value
+    
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"Setting {key} must be a non-empty string")
+    return value
+
+def check_whisper_model(key, name):
+    """Raise ValueError unless name is one of Whisper's downloadable models"""
+    import whisper  # only needed when a model is changed at runtime
+    if name not in whisper.available_models():
+        raise ValueError(f"Unknown Whisper model for {key}: {name}")
+
+def check_model_routes(routes):
+    """Raise ValueError unless every route has a model and valid optional filters"""
+    for route in routes:
+        if not isinstance(route, dict):
+            raise ValueError(f"Each WHISPER_MODEL_ROUTES entry must be an object: {route!r}")
+        if not isinstance(route.get('model'), str) or not route['model']:
+            raise ValueError(f"WHISPER_MODEL_ROUTES entry needs a model name: {route!r}")
+        if route.get('language') is not None and not isinstance(route['language'], str):
+            raise ValueError(f"WHISPER_MODEL_ROUTES language must be a string: {route!r}")
+        max_duration = route.get('max_duration')
+        if max_duration is not None and (isinstance(max_duration, bool) or not isinstance(max_duration, (int, float))):
+            raise ValueError(f"WHISPER_MODEL_ROUTES max_duration must be a number: {route!r}")
+
+def apply_runtime_overrides(config_class, overrides):
+    """Validate overrides and merge them over the config defaults
+
+    Raises ValueError for unknown settings or invalid values.
+    """
+    settings = {key: getattr(config_class, key) for key in RELOADABLE_SETTINGS}
+    for key, value in overrides.items():
+        if key not in RELOADABLE_SETTINGS:
+            raise ValueError(f"Setting cannot be changed at runtime: {key}")
+        settings[key] = parse_runtime_setting(key, value, settings[key])
+    
+    # Routes are checked on every load, including ones set through the environment
+    check_model_routes(settings['WHISPER_MODEL_ROUTES'])
+    if 'WHISPER_MODEL' in overrides:
+        check_whisper_model('WHISPER_MODEL', settings['WHISPER_MODEL'])
+    if 'WHISPER_MODEL_ROUTES' in overrides:
+        for route in settings['WHISPER_MODEL_ROUTES']:
+            check_whisper_model('WHISPER_MODEL_ROUTES', route['model'])
+    return settings
+
+def load_runtime_config(config_class):
+    """Get reloadable settings: config defaults overridden by the runtime config file"""
+    return apply_runtime_overrides(config_class, read_runtime_overrides(config_class))
\ No newline at end of file
@@ -1,24 +1,35 @@
-from flask import Flask, request, render_template, send_from_directory, redirect, url_for, jsonify, Response
+from flask import Flask, request, render_template, send_from_directory, redirect, url_for, jsonify, Response, stream_with_context
 import os
 import uuid
 import whisper
 import ffmpeg
+import numpy as np
 from werkzeug.utils import secure_filename
-from googletrans import Translator
+from werkzeug.formparser import parse_form_data
+from googletrans import Translator, LANGUAGES
 import yt_dlp
 import re
-from config import get_config
+from config import get_config, load_runtime_config, read_runtime_overrides, apply_runtime_overrides
 import time
+import json
+import cProfile
+import threading
+from contextlib import contextmanager
+from http.cookiejar import MozillaCookieJar
+from urllib.parse import urlparse
 
 app = Flask(__name__, static_folder='static')
 
 # Load configuration
 config_class = get_config()
 app.config.from_object(config_class)
+app.config.update(load_runtime_config(config_class))
 
 # Create directories
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['SUBTITLE_FOLDER'], exist_ok=True)
+os.makedirs(app.config['PROFILE_FOLDER'], exist_ok=True)
+os.makedirs(app.config['UPLOAD_TEMP_FOLDER'], exist_ok=True)
 os.makedirs('static/SVG', exist_ok=True)
 
 # Initialize Whisper model
@@ -26,9 +37,6 @@ print(f"Loading Whisper model: {app.config['WHISPER_MODEL']}")
 model = whisper.load_model(app.config['WHISPER_MODEL'])
 translator = Translator()
 
-# Get cookie files from config
-COOKIE_FILES = app.config['COOKIE_FILES']
-
 # Console log storage
 console_logs = []
 
@@ -41,14 +49,591 @@ def log_to_console(message):
     if len(console_logs) > 1000:
         console_logs.pop(0)
 
-def get_cookies_file(url):
-    """Get the appropriate cookies file for a URL"""
-    for domain, cookie_file in COOKIE_FILES.items():
-        if domain in url.lower():
-            if os.path.exists(cookie_file):
-                return cookie_file
+def emit_console_event(event, payload):
+    """Add a structured event to console logs (sent as a named SSE event)"""
+    console_logs.append({'event': event, 'data': payload})
+    if len(console_logs) > 1000:
+        console_logs.pop(0)
+
+def file_size(path):
+    """Size of a file in bytes, or None if it does not exist"""
+    return os.path.getsize(path) if path and os.path.exists(path) else None
+
+@contextmanager
+def trace_span(spans, stage, **attrs):
+    """Time a pipeline stage, attach it to spans and emit it on the console stream
+
+    The yielded dict can be updated inside the block (e.g. with bytes processed).
+    """
+    span = {'stage': stage, **attrs, 'start': time.time()}
+    try:
+        yield span
+    except Exception as e:
+        span['error'] = str(e)
+        raise
+    finally:
+        span['end'] = time.time()
+        span['duration_ms'] = round((span['end'] - span['start']) * 1000, 1)
+        spans.append(span)
+        emit_console_event('span', span)
+
+def get_cookies_domain(url):
+    """Get the cookie files domain matching the URL host (or one of its parent domains)"""
+    host = (urlparse(url).hostname or '').lower()
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        domain = '.'.join(labels[i:])
+        if domain in app.config['COOKIE_FILES']:
+            return domain
+    return None
+
+class YoutubeDLPool:
+    """Per-domain pool of reusable yt-dlp sessions
+
+    Cookie files are parsed once and only re-read when their mtime changes.
+    Idle YoutubeDL instances are kept around so their keep-alive HTTP
+    connections are reused across links and requests.
+    """
+
+    def __init__(self, max_idle):
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.cookie_jars = {}  # cookie file -> (mtime, MozillaCookieJar)
+        self.idle = {}  # (domain, format, flat, generation) -> [(cookie mtime, YoutubeDL), ...]
+        # Bumped by clear() so sessions borrowed before it are not pooled again
+        self.generation = 0
+
+    def get_cookie_jar(self, cookie_file):
+        """Return (mtime, jar) for a cookie file, reloading it if it changed on disk"""
+        try:
+            mtime = os.path.getmtime(cookie_file)
+        except OSError:
+            self.cookie_jars.pop(cookie_file, None)
+            return None, None
+        cached = self.cookie_jars.get(cookie_file)
+        if cached and cached[0] == mtime:
+            return cached
+        jar = MozillaCookieJar(cookie_file)
+        jar.load(ignore_discard=True, ignore_expires=True)
+        self.cookie_jars[cookie_file] = (mtime, jar)
+        log_to_console(f"Loaded cookies file: {cookie_file}")
+        return mtime, jar
+
+    def create(self, format_string, jar, flat=False):
+        """Build a new YoutubeDL session using config settings"""
+        ydl_opts = {
+            'format': format_string,
+            # Replaced per download with set_output_template()
+            'outtmpl': os.path.join(app.config['UPLOAD_FOLDER'], '%(id)s.%(ext)s'),
+            'quiet': True,
+            'no_warnings': True,
+            'user_agent': app.config['USER_AGENT'],
+            'retries': 3,
+            'fragment_retries': 3,
+            'skip_unavailable_fragments': True,
+        }
+        if flat:
+            # List playlist/channel entries without resolving each video
+            ydl_opts['extract_flat'] = 'in_playlist'
+            ydl_opts['lazy_playlist'] = True
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        # Cookies come from the parsed cache instead of 'cookiefile', so yt-dlp
+        # neither re-parses nor writes back the file for every session
+        if jar is not None:
+            for cookie in jar:
+                ydl.cookiejar.set_cookie(cookie)
+        return ydl
+
+    @contextmanager
+    def session(self, url, format_string, flat=False):
+        """Borrow a YoutubeDL session for a URL, returning it to the pool afterwards"""
+        domain = get_cookies_domain(url)
+        cookie_file = app.config['COOKIE_FILES'][domain] if domain else None
+        with self.lock:
+            key = (domain, format_string, flat, self.generation)
+            mtime, jar = self.get_cookie_jar(cookie_file) if cookie_file else (None, None)
+            ydl = None
+            idle = self.idle.get(key, [])
+            while idle and ydl is None:
+                idle_mtime, idle_ydl = idle.pop()
+                if idle_mtime == mtime:
+                    ydl = idle_ydl
+                else:
+                    # Cookie file changed since this session was built
+                    idle_ydl.close()
+        if jar is not None:
+            log_to_console(f"Using cookies file: {cookie_file}")
+        if ydl is None:
+            ydl = self.create(format_string, jar, flat)
+        try:
+            yield ydl
+        finally:
+            self.release(key, mtime, ydl)
+
+    def release(self, key, mtime, ydl):
+        """Return a session to the pool, closing it if the pool is full or was cleared"""
+        with self.lock:
+            idle = self.idle.setdefault(key, []) if key[-1] == self.generation else None
+            if idle is not None and len(idle) < self.max_idle:
+                idle.append((mtime, ydl))
+                return
+        ydl.close()
+
+    def clear(self):
+        """Close all idle sessions and drop cached cookie jars
+
+        Sessions currently borrowed are closed when they are released.
+        """
+        with self.lock:
+            sessions = [ydl for idle in self.idle.values() for _, ydl in idle]
+            self.idle = {}
+            self.cookie_jars = {}
+            self.generation += 1
+        for ydl in sessions:
+            ydl.close()
+
+ytdl_pool = YoutubeDLPool(app.config['YTDL_POOL_SIZE'])
+
+def set_output_template(ydl, outtmpl):
+    """Point a borrowed session's downloads (including playlist entries) at outtmpl"""
+    # yt-dlp keeps output templates as a dict keyed by type after __init__
+    ydl.params['outtmpl']['default'] = outtmpl
+
+class DownloadArchive:
+    """Record of downloaded videos, one "<extractor> <id>" per line (yt-dlp archive format)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.ids = None
+
+    def load(self):
+        """Read the archive file on first use"""
+        if self.ids is None:
+            self.ids = set()
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.ids = {line.strip() for line in f if line.strip()}
+        return self.ids
+
+    def __contains__(self, archive_id):
+        with self.lock:
+            return archive_id in self.load()
+
+    def add(self, archive_id):
+        with self.lock:
+            if archive_id in self.load():
+                return
+            self.ids.add(archive_id)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(archive_id + '\n')
+
+download_archive = DownloadArchive(app.config['DOWNLOAD_ARCHIVE_FILE'])
+
+def get_archive_id(extractor_key, video_id):
+    """Archive id for a video, as yt-dlp writes it"""
+    if not extractor_key or not video_id:
+        return None
+    return f"{extractor_key.lower()} {video_id}"
+
+def is_collection_url(url):
+    """Check if a URL points to a playlist or channel rather than a single video"""
+    return any(re.search(pattern, url) for pattern in app.config['PLAYLIST_URL_PATTERNS'])
+
+def parse_date(value):
+    """Normalize YYYY-MM-DD or YYYYMMDD to YYYYMMDD (None if empty)"""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid date: {value} (expected YYYY-MM-DD)")
+    value = value.replace('-', '')
+    if not re.fullmatch(r'\d{8}', value):
+        raise ValueError(f"Invalid date: {value} (expected YYYY-MM-DD)")
+    return value
+
+def parse_max_items(value):
+    """Validate the requested playlist item limit (None if not given)"""
+    if value in (None, ''):
+        return None
+    try:
+        max_items = int(value)
+    except (TypeError, ValueError):
+        max_items = 0
+    if max_items < 1:
+        raise ValueError(f"Invalid max_items: {value} (expected a positive number)")
+    return max_items
+
+def get_upload_date(meta):
+    """Upload date of a (possibly flat) info dict as YYYYMMDD, if known"""
+    if meta.get('upload_date'):
+        return meta['upload_date']
+    if meta.get('timestamp'):
+        return time.strftime('%Y%m%d', time.gmtime(meta['timestamp']))
     return None
 
+def iter_playlist_entries(url, max_items, date_after, depth=0):
+    """Lazily yield (video URL, info or None) for a playlist/channel as pages are fetched
+
+    Entries already in the download archive or uploaded before date_after
+    are skipped and don't count towards max_items. When date_after is set and
+    the listing has no date for an entry, the entry is extracted here and its
+    info is yielded so the pipeline doesn't extract it again. Channel listings
+    are newest first, so they stop at the first entry older than date_after.
+    """
+    with ytdl_pool.session(url, None, flat=True) as ydl:
+        log_to_console(f"Expanding playlist: {url}")
+        result = ydl.extract_info(url, download=False, process=False)
+        # Follow redirects (e.g. channel aliases) to the actual listing
+        for _ in range(3):
+            if result.get('_type') not in ('url', 'url_transparent'):
+                break
+            result = ydl.extract_info(result['url'], download=False, process=False, ie_key=result.get('ie_key'))
+        if result.get('_type') not in ('playlist', 'multi_video'):
+            raise Exception(f"Not a playlist or channel: {url}")
+        
+        newest_first = not re.search(r'[?&]list=|/playlist\b', url)
+        count = 0
+        for entry in result.get('entries') or []:
+            if count >= max_items:
+                log_to_console(f"Reached playlist limit of {max_items} items: {url}")
+                return
+            if not entry:
+                continue
+            entry_url = entry.get('webpage_url') or entry.get('url')
+            if not entry_url:
+                continue
+            # Channels list tabs (videos, shorts, ...) that are playlists themselves
+            if entry.get('_type') == 'playlist' or (depth == 0 and is_collection_url(entry_url)):
+                if depth == 0:
+                    for nested in iter_playlist_entries(entry_url, max_items - count, date_after, depth + 1):
+                        count += 1
+                        yield nested
+                continue
+            if get_archive_id(entry.get('ie_key'), entry.get('id')) in download_archive:
+                log_to_console(f"Already downloaded, skipping: {entry_url}")
+                continue
+            
+            entry_info = None
+            upload_date = get_upload_date(entry)
+            if date_after and not upload_date:
+                entry_info = ydl.extract_info(entry_url, download=False, process=False)
+                upload_date = get_upload_date(entry_info)
+            if date_after and upload_date and upload_date < date_after:
+                if newest_first:
+                    log_to_console(f"Reached videos uploaded before {date_after}: {url}")
+                    return
+                continue
+            count += 1
+            yield entry_url, entry_info
+
+def iter_download_links(links, max_items, date_after):
+    """Yield (url, info or None, playlist url, error) for every link, expanding playlists as they are listed"""
+    for url in links:
+        if is_collection_url(url):
+            try:
+                for entry_url, entry_info in iter_playlist_entries(url, max_items, date_after):
+                    yield entry_url, entry_info, url, None
+            except Exception as e:
+                log_to_console(f"Error expanding playlist {url}: {str(e)}")
+                yield url, None, None, e
+        else:
+            yield url, None, None, None
+
+# Serialize runtime config reloads and Whisper model switches
+runtime_config_lock = threading.Lock()
+whisper_switch_lock = threading.Lock()
+
+# Routed and language-ID Whisper models, loaded on first use
+whisper_models = {}
+whisper_models_lock = threading.Lock()
+
+def get_whisper_model(name):
+    """Get a loaded Whisper model by name (the default model or a cached extra one)"""
+    if name == app.config['WHISPER_MODEL']:
+        return model
+    with whisper_models_lock:
+        if name not in whisper_models:
+            log_to_console(f"Loading Whisper model: {name}")
+            whisper_models[name] = whisper.load_model(name)
+        return whisper_models[name]
+
+def get_extra_model_names():
+    """Names of the models kept in whisper_models besides the default model"""
+    names = {route['model'] for route in app.config['WHISPER_MODEL_ROUTES']}
+    names.add(app.config['LANGUAGE_ID_MODEL'])
+    names.discard(app.config['WHISPER_MODEL'])
+    return names
+
+def prune_whisper_models():
+    """Drop cached models no longer named by a route or LANGUAGE_ID_MODEL"""
+    needed = get_extra_model_names()
+    with whisper_models_lock:
+        for name in [name for name in whisper_models if name not in needed]:
+            del whisper_models[name]
+            log_to_console(f"Unloaded Whisper model: {name}")
+
+def switch_whisper_model(name):
+    """Load a Whisper model alongside the current one, then swap it in
+
+    Transcriptions already running keep using the model they started with.
+    """
+    global model
+    with whisper_switch_lock:
+        if name == app.config['WHISPER_MODEL']:
+            return
+        with whisper_models_lock:
+            # Reuse the instance if a route already loaded this model
+            new_model = whisper_models.pop(name, None)
+        if new_model is None:
+            try:
+                log_to_console(f"Loading Whisper model: {name}")
+                new_model = whisper.load_model(name)
+            except Exception as e:
+                log_to_console(f"Failed to load Whisper model {name}: {str(e)}")
+                return
+        old_name, old_model = app.config['WHISPER_MODEL'], model
+        model = new_model
+        app.config['WHISPER_MODEL'] = name
+        if old_name in get_extra_model_names():
+            # Still used by a route or for language detection
+            with whisper_models_lock:
+                whisper_models.setdefault(old_name, old_model)
+        prune_whisper_models()
+        log_to_console(f"Switched Whisper model to: {name}")
+
+def reload_runtime_config():
+    """Re-read reloadable settings and apply changes without a restart
+
+    New download settings apply to the next link processed; a Whisper model
+    change is loaded in the background and swapped in when ready.
+    """
+    with runtime_config_lock:
+        settings = load_runtime_config(config_class)
+        changed = {key: value for key, value in settings.items() if app.config.get(key) != value}
+        whisper_model = changed.pop('WHISPER_MODEL', None)
+        app.config.update(changed)
+        
+        if 'YTDL_POOL_SIZE' in changed:
+            ytdl_pool.max_idle = changed['YTDL_POOL_SIZE']
+        if {'COOKIE_FILES', 'USER_AGENT', 'VIDEO_QUALITY', 'AUDIO_QUALITY'} & changed.keys():
+            # Pooled sessions were built with the old cookies / user agent / formats
+            ytdl_pool.clear()
+        if 'WHISPER_MODEL_ROUTES' in changed:
+            prune_whisper_models()
+    
+    for key in changed:
+        log_to_console(f"Runtime config updated: {key}")
+    if whisper_model:
+        changed['WHISPER_MODEL'] = whisper_model
+        threading.Thread(target=switch_whisper_model, args=(whisper_model,), daemon=True).start()
+    return changed
+
+def watch_runtime_config():
+    """Reload runtime settings whenever the runtime config file changes"""
+    path = app.config['RUNTIME_CONFIG_FILE']
+    last_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    while True:
+        time.sleep(app.config['RUNTIME_CONFIG_POLL_SECONDS'])
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        if mtime == last_mtime:
+            continue
+        last_mtime = mtime
+        try:
+            reload_runtime_config()
+        except Exception as e:
+            log_to_console(f"Runtime config reload failed: {str(e)}")
+
+threading.Thread(target=watch_runtime_config, daemon=True).start()
+
+def get_metadata_path(filename):
+    """Path of the metadata file kept next to a media file's transcript"""
+    return os.path.join(app.config['SUBTITLE_FOLDER'], os.path.splitext(filename)[0] + '.meta.json')
+
+def load_media_metadata(filename):
+    """Load stored metadata for a media file (empty if none)"""
+    path = get_metadata_path(filename)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_media_metadata(filename, **fields):
+    """Merge fields into the stored metadata for a media file"""
+    metadata = load_media_metadata(filename)
+    metadata.update(fields)
+    with open(get_metadata_path(filename), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+def load_audio_window(path, seconds=30):
+    """Decode only the first seconds of a file as 16 kHz mono float audio"""
+    out, _ = (
+        ffmpeg.input(path, t=seconds)
+        .output('-', format='s16le', acodec='pcm_s16le', ac=1, ar=whisper.audio.SAMPLE_RATE)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+def detect_language(path):
+    """Language-ID pre-pass on the first 30 seconds of audio
+
+    Uses the small LANGUAGE_ID_MODEL and also returns the probability that the
+    window has no speech, plus the file duration. Results are stored in the
+    file metadata and reused while the file is unchanged.
+    """
+    filename = os.path.basename(path)
+    mtime = os.path.getmtime(path)
+    metadata = load_media_metadata(filename)
+    if metadata.get('language') and metadata.get('mtime') == mtime:
+        return metadata
+    
+    lid_model = get_whisper_model(app.config['LANGUAGE_ID_MODEL'])
+    audio = whisper.pad_or_trim(load_audio_window(path))
+    mel = whisper.log_mel_spectrogram(audio, n_mels=lid_model.dims.n_mels).to(lid_model.device)
+    _, probs = lid_model.detect_language(mel)
+    language = max(probs, key=probs.get)
+    options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                      fp16=lid_model.device.type == 'cuda')
+    decoded = whisper.decode(lid_model, mel, options)
+    
+    try:
+        duration = float(ffmpeg.probe(path)['format']['duration'])
+    except (ffmpeg.Error, KeyError, ValueError):
+        duration = None
+    
+    return save_media_metadata(
+        filename,
+        mtime=mtime,
+        language=language,
+        language_probability=round(probs[language], 3),
+        no_speech_probability=round(decoded.no_speech_prob, 3),
+        duration=duration
+    )
+
+def select_whisper_model(language, duration):
+    """Pick a model from WHISPER_MODEL_ROUTES (first match wins, else WHISPER_MODEL)"""
+    for route in app.config['WHISPER_MODEL_ROUTES']:
+        if route.get('language') not in (None, language):
+            continue
+        max_duration = route.get('max_duration')
+        if max_duration is not None and (duration is None or duration > max_duration):
+            continue
+        return route['model']
+    return app.config['WHISPER_MODEL']
+
+def transcribe_media(path, spans):
+    """Detect the language, route to a model and transcribe a media file
+
+    Returns (text, segments, metadata); text is None when transcription was
+    skipped because the audio doesn't appear to contain speech.
+    """
+    filename = os.path.basename(path)
+    with trace_span(spans, 'language_id', file=filename) as span:
+        metadata = detect_language(path)
+        span['language'] = metadata['language']
+        span['no_speech_probability'] = metadata['no_speech_probability']
+    log_to_console(f"Detected language: {metadata['language']} ({metadata['language_probability']:.0%})")
+    
+    if app.config['SKIP_NON_SPEECH'] and metadata['no_speech_probability'] >= app.config['NO_SPEECH_THRESHOLD']:
+        log_to_console(f"No speech detected, skipping transcription: {filename}")
+        return None, [], metadata
+    
+    model_name = select_whisper_model(metadata['language'], metadata['duration'])
+    with trace_span(spans, 'whisper', file=filename, bytes=file_size(path), model=model_name) as span:
+        result = get_whisper_model(model_name).transcribe(path, language=metadata['language'])
+        text = result['text'].strip()
+        span['chars'] = len(text)
+    save_media_metadata(filename, whisper_model=model_name)
+    return text, result['segments'], metadata
+
+def get_segments_path(sub_file):
+    """Path of the timestamped segments (JSON lines) saved next to a transcript"""
+    return os.path.join(app.config['SUBTITLE_FOLDER'], os.path.splitext(sub_file)[0] + '.segments.jsonl')
+
+def save_transcript(sub_file, text, segments):
+    """Write a transcript and its timestamped segments, one JSON object per line"""
+    with open(os.path.join(app.config['SUBTITLE_FOLDER'], sub_file), 'w', encoding='utf-8') as f:
+        f.write(text)
+    with open(get_segments_path(sub_file), 'w', encoding='utf-8') as f:
+        for segment in segments:
+            f.write(json.dumps({
+                'start': round(segment['start'], 2),
+                'end': round(segment['end'], 2),
+                'text': segment['text']
+            }) + '\n')
+
+def iter_text_chunks(path, max_chars):
+    """Yield chunks of a plain-text file, split after sentences, without reading it all"""
+    buffer = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        for block in iter(lambda: f.read(max_chars), ''):
+            buffer += block
+            while len(buffer) >= max_chars:
+                sentence_ends = [m.end() for m in re.finditer(r'[.!?]\s', buffer[:max_chars])]
+                cut = sentence_ends[-1] if sentence_ends else buffer.rfind(' ', 0, max_chars) + 1 or max_chars
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+    if buffer:
+        yield buffer
+
+def iter_transcript_segments(sub_file):
+    """Yield transcript segments ({index, start, end, text}) one at a time
+
+    Timestamps come from the saved segments file; transcripts without one
+    (older or edited files) are split into sentence chunks with no timestamps.
+    """
+    segments_path = get_segments_path(sub_file)
+    if os.path.exists(segments_path):
+        with open(segments_path, 'r', encoding='utf-8') as f:
+            for index, line in enumerate(f):
+                yield {'index': index, **json.loads(line)}
+        return
+    
+    chunks = iter_text_chunks(os.path.join(app.config['SUBTITLE_FOLDER'], sub_file), app.config['SEGMENT_MAX_CHARS'])
+    for index, text in enumerate(chunks):
+        yield {'index': index, 'start': None, 'end': None, 'text': text}
+
+def iter_batches(segments, max_chars):
+    """Group segments into lists of up to max_chars of text"""
+    batch, size = [], 0
+    for segment in segments:
+        if batch and size + len(segment['text']) > max_chars:
+            yield batch
+            batch, size = [], 0
+        batch.append(segment)
+        size += len(segment['text'])
+    if batch:
+        yield batch
+
+def translate_segments(segments, lang):
+    """Translate segments batch by batch, keeping each segment's source timestamps
+
+    Segments of a batch are sent as one newline-separated request; if the
+    translation doesn't come back with one line per segment they are
+    translated one by one instead.
+    """
+    for batch in iter_batches(segments, app.config['TRANSLATE_BATCH_CHARS']):
+        texts = [' '.join(segment['text'].split()) for segment in batch]
+        translated = translator.translate('\n'.join(texts), dest=lang).text.split('\n')
+        if len(translated) != len(batch):
+            translated = [translator.translate(text, dest=lang).text for text in texts]
+        for segment, text in zip(batch, translated):
+            yield {**segment, 'translated': text.strip()}
+
+def format_srt_time(seconds):
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
+
+def format_stream_item(item, stream_format):
+    """Encode one streamed item as an NDJSON line or an SSE message"""
+    if stream_format == 'sse':
+        return f"data: {json.dumps(item)}\n\n"
+    return json.dumps(item) + '\n'
+
 def normalize_filename(title, extractor_key, uploader, is_mp3=False):
     """Normalize filename according to specifications"""
     # Strip #, emojis, and special characters
@@ -86,7 +671,7 @@ def sort():
 
 @app.route('/transcribe')
 def transcribe():
-    downloads = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.endswith(('.mp4', '.mp3'))]
+    downloads = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.lower().endswith(tuple(app.config['UPLOAD_EXTENSIONS']))]
     downloads.sort(key=lambda x: os.path.getmtime(os.path.join(app.config['UPLOAD_FOLDER'], x)), reverse=True)
     transcripts = [f for f in os.listdir(app.config['SUBTITLE_FOLDER']) if f.endswith('.txt')]
     transcripts.sort(key=lambda x: os.path.getmtime(os.path.join(app.config['SUBTITLE_FOLDER'], x)), reverse=True)
@@ -103,116 +688,157 @@ def console_stream():
         while True:
             if len(console_logs) > last_index:
                 for i in range(last_index, len(console_logs)):
-                    yield f"data: {console_logs[i]}\n\n"
+                    entry = console_logs[i]
+                    if isinstance(entry, dict):
+                        yield f"event: {entry['event']}\ndata: {json.dumps(entry['data'])}\n\n"
+                    else:
+                        yield f"data: {entry}\n\n"
                 last_index = len(console_logs)
             time.sleep(0.1)
     
     return Response(generate(), mimetype='text/event-stream')
 
+def process_media(final_file, info, spans, mp3_only, transcribe):
+    """Run the conversion and transcription stages on a file in the upload folder
+
+    Shared by downloaded and uploaded media; results are added to info.
+    """
+    filename = os.path.basename(final_file)
+    
+    # Convert to MP3 if requested
+    if mp3_only and not filename.endswith('.mp3'):
+        audio_path = os.path.splitext(final_file)[0] + '.mp3'
+        try:
+            log_to_console(f"Converting to MP3: {filename}")
+            with trace_span(spans, 'ffmpeg', file=filename, bytes=file_size(final_file)) as span:
+                ffmpeg.input(final_file).output(audio_path, acodec='mp3').run(overwrite_output=True, quiet=True)
+                span['bytes_out'] = file_size(audio_path)
+            os.remove(final_file)  # Remove video file
+            info['filename'] = os.path.basename(audio_path)
+            final_file = audio_path
+            log_to_console(f"Converted to MP3: {os.path.basename(audio_path)}")
+        except Exception as e:
+            log_to_console(f"MP3 conversion failed: {str(e)}")
+    
+    # Transcribe if requested
+    if transcribe:
+        try:
+            log_to_console(f"Transcribing: {filename}")
+            text, segments, metadata = transcribe_media(final_file, spans)
+            info['language'] = metadata['language']
+            if text is None:
+                info['transcript_skipped'] = 'No speech detected'
+                return final_file
+            sub_file = os.path.splitext(filename)[0] + '.txt'
+            save_transcript(sub_file, text, segments)
+            
+            info['transcript'] = sub_file
+            info['transcript_length'] = len(text)
+            log_to_console(f"Transcription complete: {sub_file} ({len(text)} chars)")
+        except Exception as e:
+            info['transcript_error'] = str(e)
+            log_to_console(f"Transcription failed: {str(e)}")
+    return final_file
+
+profiling_lock = threading.Lock()
+
 @app.route('/download', methods=['POST'])
 def download():
     data = request.get_json()
+    # Profile a single request when both the server and the client ask for it
+    if app.config['ENABLE_PROFILING'] and data.get('profile', False):
+        # Only one profiler can be active at a time
+        if not profiling_lock.acquire(blocking=False):
+            log_to_console("Another request is being profiled, running without profiling")
+            return run_download(data)
+        try:
+            profiler = cProfile.Profile()
+            response = profiler.runcall(run_download, data)
+            profile_path = os.path.join(app.config['PROFILE_FOLDER'], f"download-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+            profiler.dump_stats(profile_path)
+        finally:
+            profiling_lock.release()
+        log_to_console(f"Profile saved: {profile_path}")
+        return response
+    return run_download(data)
+
+def run_download(data):
     links = data.get('links', [])[:app.config['MAX_LINKS_PER_REQUEST']]  # Limit based on config
     mp3_only = data.get('mp3', False)
     transcribe = data.get('transcribe', False)
+    try:
+        max_items = min(parse_max_items(data.get('max_items')) or app.config['MAX_PLAYLIST_ITEMS'], app.config['MAX_PLAYLIST_ITEMS'])
+        date_after = parse_date(data.get('date_after'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     results = []
 
     log_to_console(f"Starting download of {len(links)} links")
 
-    for i, url in enumerate(links):
+    for i, (url, entry_info, playlist, error) in enumerate(iter_download_links(links, max_items, date_after)):
+        spans = []
         try:
-            log_to_console(f"Processing link {i+1}/{len(links)}: {url}")
+            if error:
+                raise error
+            log_to_console(f"Processing link {i+1}: {url}")
             uid = str(uuid.uuid4())[:8]
-            info = {'url': url, 'index': i}
+            info = {'url': url, 'index': i, 'spans': spans}
+            if playlist:
+                info['playlist'] = playlist
             
-            # Get cookies file for this URL
-            cookies_file = get_cookies_file(url)
-            
-            # Enhanced yt-dlp options using config
+            # Borrow a pooled yt-dlp session for this URL's domain
             format_string = app.config['VIDEO_QUALITY'] if not mp3_only else app.config['AUDIO_QUALITY']
-            ydl_opts = {
-                'format': format_string,
-                'outtmpl': os.path.join(app.config['UPLOAD_FOLDER'], f'{uid}.%(ext)s'),
-                'quiet': True,
-                'no_warnings': True,
-                'user_agent': app.config['USER_AGENT'],
-                'retries': 3,
-                'fragment_retries': 3,
-                'skip_unavailable_fragments': True,
-            }
-            
-            # Add cookies if available
-            if cookies_file:
-                ydl_opts['cookiefile'] = cookies_file
-                log_to_console(f"Using cookies file: {cookies_file}")
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with ytdl_pool.session(url, format_string) as ydl:
                 # Extract info first
                 log_to_console(f"Extracting info for: {url}")
-                meta = ydl.extract_info(url, download=False)
+                with trace_span(spans, 'extract_info', url=url):
+                    if entry_info:
+                        # Already extracted while checking its date during playlist expansion
+                        meta = ydl.process_ie_result(entry_info, download=False)
+                    else:
+                        meta = ydl.extract_info(url, download=False)
                 title = meta.get('title', 'video')
                 extractor_key = meta.get('extractor_key', 'Unknown')
                 uploader = meta.get('uploader', 'unknown')
                 
                 log_to_console(f"Downloading: {title} from {extractor_key}")
                 # Download the file
-                ydl.download([url])
-                
-                # Find the downloaded file
-                downloaded_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(uid)]
-                if not downloaded_files:
-                    raise Exception("No file downloaded")
-                
-                temp_file = os.path.join(app.config['UPLOAD_FOLDER'], downloaded_files[0])
-                
-                # Normalize filename with correct extension
-                normalized_name = normalize_filename(title, extractor_key, uploader, mp3_only)
-                final_file = os.path.join(app.config['UPLOAD_FOLDER'], normalized_name)
-                
-                # Rename to final name
+                with trace_span(spans, 'download', url=url) as span:
+                    # Reuse the extracted info instead of extracting again
+                    set_output_template(ydl, os.path.join(app.config['UPLOAD_FOLDER'], f'{uid}.%(ext)s'))
+                    ydl.process_ie_result(meta, download=True)
+                    
+                    # Find the downloaded file
+                    downloaded_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(uid)]
+                    if not downloaded_files:
+                        raise Exception("No file downloaded")
+                    
+                    temp_file = os.path.join(app.config['UPLOAD_FOLDER'], downloaded_files[0])
+                    span['bytes'] = file_size(temp_file)
+            
+            # Normalize filename with correct extension
+            normalized_name = normalize_filename(title, extractor_key, uploader, mp3_only)
+            final_file = os.path.join(app.config['UPLOAD_FOLDER'], normalized_name)
+            
+            # Rename to final name
+            with trace_span(spans, 'rename', file=normalized_name) as span:
                 if os.path.exists(temp_file):
                     os.rename(temp_file, final_file)
-                
-                log_to_console(f"Downloaded: {normalized_name}")
-                
-                info['filename'] = normalized_name
-                info['title'] = title
-                info['uploader'] = uploader
-                info['platform'] = extractor_key
-                
-                # Convert to MP3 if requested
-                if mp3_only and not normalized_name.endswith('.mp3'):
-                    audio_path = final_file.replace('.mp4', '.mp3')
-                    try:
-                        log_to_console(f"Converting to MP3: {normalized_name}")
-                        ffmpeg.input(final_file).output(audio_path, acodec='mp3').run(overwrite_output=True, quiet=True)
-                        os.remove(final_file)  # Remove video file
-                        info['filename'] = os.path.basename(audio_path)
-                        final_file = audio_path
-                        log_to_console(f"Converted to MP3: {os.path.basename(audio_path)}")
-                    except Exception as e:
-                        log_to_console(f"MP3 conversion failed: {str(e)}")
-                
-                # Transcribe if requested
-                if transcribe:
-                    try:
-                        log_to_console(f"Transcribing: {normalized_name}")
-                        result = model.transcribe(final_file)
-                        text = result['text'].strip()
-                        sub_file = normalized_name.replace('.mp4', '.txt').replace('.mp3', '.txt')
-                        sub_path = os.path.join(app.config['SUBTITLE_FOLDER'], sub_file)
-                        
-                        with open(sub_path, 'w', encoding='utf-8') as f:
-                            f.write(text)
-                        
-                        info['transcript'] = sub_file
-                        info['transcript_length'] = len(text)
-                        log_to_console(f"Transcription complete: {sub_file} ({len(text)} chars)")
-                    except Exception as e:
-                        info['transcript_error'] = str(e)
-                        log_to_console(f"Transcription failed: {str(e)}")
-                
-                results.append(info)
+                span['bytes'] = file_size(final_file)
+            
+            log_to_console(f"Downloaded: {normalized_name}")
+            archive_id = get_archive_id(extractor_key, meta.get('id'))
+            if archive_id:
+                download_archive.add(archive_id)
+            
+            info['filename'] = normalized_name
+            info['title'] = title
+            info['uploader'] = uploader
+            info['platform'] = extractor_key
+            
+            process_media(final_file, info, spans, mp3_only, transcribe)
+            
+            results.append(info)
 
         except Exception as e:
             log_to_console(f"Error processing {url}: {str(e)}")
@@ -220,12 +846,224 @@ def download():
                 'url': url, 
                 'index': i, 
                 'error': str(e),
-                'status': 'failed'
+                'status': 'failed',
+                'spans': spans
             })
 
     log_to_console(f"Download session complete: {len([r for r in results if not r.get('error')])} successful, {len([r for r in results if r.get('error')])} failed")
     return jsonify(results)
 
+def upload_filename(original, uid):
+    """Final name for an uploaded file, not clashing with existing files"""
+    stem, ext = os.path.splitext(original)
+    # secure_filename drops non-ASCII characters, so the stem may end up empty
+    stem = secure_filename(stem) or uid
+    ext = ext.lower()
+    filename = f"UP-{stem}{ext}"
+    if os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename)):
+        filename = f"UP-{stem}.{uid}{ext}"
+    return filename
+
+def parse_flag(value):
+    """Read an on/off option sent as a JSON boolean or a 'true'/'false' string"""
+    return value is True or (isinstance(value, str) and value.lower() == 'true')
+
+def is_allowed_upload(filename):
+    """Check the upload has a media file extension"""
+    return os.path.splitext(filename)[1].lower() in app.config['UPLOAD_EXTENSIONS']
+
+def ingest_upload(temp_file, original, uid, mp3_only, transcribe, spans):
+    """Move a completed upload into the upload folder and run the processing stages"""
+    filename = upload_filename(original, uid)
+    final_file = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    with trace_span(spans, 'rename', file=filename) as span:
+        os.replace(temp_file, final_file)
+        span['bytes'] = file_size(final_file)
+    log_to_console(f"Uploaded: {filename}")
+    
+    info = {'filename': filename, 'title': os.path.splitext(original)[0], 'uploader': 'local',
+            'platform': 'Upload', 'spans': spans}
+    process_media(final_file, info, spans, mp3_only, transcribe)
+    return info
+
+@app.route('/upload', methods=['POST'])
+def upload():
+    """Upload a media file, streaming the multipart body straight to disk"""
+    uid = str(uuid.uuid4())[:8]
+    temp_files = []
+    
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        # File parts are written to disk as they are parsed instead of being buffered
+        temp_file = os.path.join(app.config['UPLOAD_TEMP_FOLDER'], f'{uid}-{len(temp_files)}.part')
+        temp_files.append(temp_file)
+        return open(temp_file, 'wb+')
+    
+    spans = []
+    try:
+        with trace_span(spans, 'upload') as span:
+            _, form, files = parse_form_data(
+                request.environ,
+                stream_factory=stream_factory,
+                max_content_length=app.config['MAX_FILE_SIZE_MB'] * 1024 * 1024
+            )
+            for storage in files.values():
+                storage.stream.close()
+            upload = files.get('file')
+            if not upload or not upload.filename:
+                return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+            if not is_allowed_upload(upload.filename):
+                return jsonify({'success': False, 'error': 'Unsupported file type'}), 400
+            span['file'] = upload.filename
+            span['bytes'] = file_size(upload.stream.name)
+        
+        info = ingest_upload(upload.stream.name, upload.filename, uid,
+                             parse_flag(form.get('mp3')), parse_flag(form.get('transcribe')), spans)
+        info['success'] = True
+        return jsonify(info)
+    except Exception as e:
+        log_to_console(f"Upload failed: {str(e)}")
+        return jsonify({'success': False, 'error': str(e), 'spans': spans}), 400
+    finally:
+        for temp_file in temp_files:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+# One lock per resumable upload so its chunks are appended one at a time
+resumable_locks = {}
+resumable_locks_lock = threading.Lock()
+
+def get_resumable_lock(upload_id):
+    """Get the lock serializing chunks of a resumable upload"""
+    with resumable_locks_lock:
+        return resumable_locks.setdefault(upload_id, threading.Lock())
+
+def cleanup_stale_uploads():
+    """Remove partial uploads that haven't received data for UPLOAD_TEMP_TTL_HOURS"""
+    folder = app.config['UPLOAD_TEMP_FOLDER']
+    cutoff = time.time() - app.config['UPLOAD_TEMP_TTL_HOURS'] * 3600
+    last_activity = {}
+    for name in os.listdir(folder):
+        # Files of one upload share a prefix (<id>.json / <id>.part, <uid>-<n>.part)
+        upload_key = name.split('.')[0]
+        try:
+            mtime = os.path.getmtime(os.path.join(folder, name))
+        except OSError:
+            continue
+        last_activity[upload_key] = max(mtime, last_activity.get(upload_key, 0))
+    
+    for name in os.listdir(folder):
+        upload_key = name.split('.')[0]
+        if last_activity.get(upload_key, cutoff) < cutoff:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                continue
+            with resumable_locks_lock:
+                resumable_locks.pop(upload_key, None)
+            log_to_console(f"Removed stale upload file: {name}")
+
+def get_resumable_upload(upload_id):
+    """Load the state of a resumable upload, or None if it doesn't exist"""
+    meta_path = os.path.join(app.config['UPLOAD_TEMP_FOLDER'], f'{upload_id}.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    state['meta_path'] = meta_path
+    state['part_path'] = os.path.join(app.config['UPLOAD_TEMP_FOLDER'], f'{upload_id}.part')
+    state['offset'] = file_size(state['part_path']) or 0
+    return state
+
+def is_upload_id(upload_id):
+    """Check an upload id has the format created by upload_resumable_start"""
+    return re.fullmatch(r'[0-9a-f]{32}', upload_id) is not None
+
+@app.route('/upload/resumable', methods=['POST'])
+def upload_resumable_start():
+    """Start a resumable upload; chunks are then sent with PUT /upload/resumable/<upload_id>"""
+    data = request.get_json()
+    filename = data.get('filename', '')
+    try:
+        size = int(data.get('size', 0))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid file size'}), 400
+    if not is_allowed_upload(filename):
+        return jsonify({'success': False, 'error': 'Unsupported file type'}), 400
+    if size <= 0 or size > app.config['MAX_FILE_SIZE_MB'] * 1024 * 1024:
+        return jsonify({'success': False, 'error': f"File size must be between 1 byte and {app.config['MAX_FILE_SIZE_MB']} MB"}), 400
+    
+    cleanup_stale_uploads()
+    upload_id = uuid.uuid4().hex
+    state = {
+        'filename': filename,
+        'size': size,
+        'mp3': parse_flag(data.get('mp3')),
+        'transcribe': parse_flag(data.get('transcribe'))
+    }
+    with open(os.path.join(app.config['UPLOAD_TEMP_FOLDER'], f'{upload_id}.json'), 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    open(os.path.join(app.config['UPLOAD_TEMP_FOLDER'], f'{upload_id}.part'), 'wb').close()
+    log_to_console(f"Upload started: {filename} ({size} bytes)")
+    return jsonify({'success': True, 'upload_id': upload_id, 'offset': 0})
+
+@app.route('/upload/resumable/<upload_id>', methods=['GET'])
+def upload_resumable_status(upload_id):
+    """Get how many bytes of a resumable upload have been received"""
+    state = get_resumable_upload(upload_id) if is_upload_id(upload_id) else None
+    if not state:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    return jsonify({'success': True, 'offset': state['offset'], 'size': state['size']})
+
+@app.route('/upload/resumable/<upload_id>', methods=['PUT'])
+def upload_resumable_chunk(upload_id):
+    """Append a chunk (Content-Range: bytes start-end/total) to a resumable upload"""
+    if not is_upload_id(upload_id):
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', request.headers.get('Content-Range', ''))
+    if not match:
+        return jsonify({'success': False, 'error': 'Missing or invalid Content-Range header'}), 400
+    start, end, total = (int(group) for group in match.groups())
+    
+    with get_resumable_lock(upload_id):
+        # Read the state under the lock so the offset can't change before the append
+        state = get_resumable_upload(upload_id)
+        if not state:
+            return jsonify({'success': False, 'error': 'Upload not found'}), 404
+        if total != state['size'] or end >= total or end < start:
+            return jsonify({'success': False, 'error': 'Content-Range does not match upload'}), 400
+        if start != state['offset']:
+            # Client is out of sync (e.g. after a dropped connection); tell it where to resume
+            return jsonify({'success': False, 'error': 'Unexpected chunk offset', 'offset': state['offset']}), 409
+        
+        remaining = end - start + 1
+        with open(state['part_path'], 'ab') as f:
+            while remaining > 0:
+                chunk = request.stream.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        offset = file_size(state['part_path'])
+        if offset < state['size']:
+            return jsonify({'success': True, 'offset': offset, 'size': state['size']})
+        
+        # Last chunk received: hand the file to the processing pipeline
+        os.remove(state['meta_path'])
+        with resumable_locks_lock:
+            resumable_locks.pop(upload_id, None)
+        spans = []
+        try:
+            info = ingest_upload(state['part_path'], state['filename'], upload_id[:8],
+                                 state['mp3'], state['transcribe'], spans)
+            info['success'] = True
+            info['offset'] = offset
+            return jsonify(info)
+        except Exception as e:
+            log_to_console(f"Upload failed: {str(e)}")
+            if os.path.exists(state['part_path']):
+                os.remove(state['part_path'])
+            return jsonify({'success': False, 'error': str(e), 'spans': spans}), 400
+
 @app.route('/downloads/<path:filename>')
 def download_file(filename):
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
@@ -270,6 +1108,76 @@ def load_subtitle():
     else:
         return jsonify({'success': False, 'error': 'File not found'})
 
+def is_plain_filename(filename):
+    """Check a requested name is a bare file name, not a path out of its folder"""
+    return bool(filename) and os.path.basename(filename) == filename and filename not in ('.', '..')
+
+@app.route('/load_subtitle/stream', methods=['POST'])
+def load_subtitle_stream():
+    """Stream a transcript segment by segment as NDJSON (or SSE with format=sse)"""
+    filename = request.form['filename']
+    stream_format = request.form.get('format', 'ndjson')
+    if not is_plain_filename(filename):
+        return jsonify({'success': False, 'error': 'Invalid file name'}), 400
+    if not os.path.exists(os.path.join(app.config['SUBTITLE_FOLDER'], filename)):
+        return jsonify({'success': False, 'error': 'File not found'}), 404
+    
+    def generate():
+        for segment in iter_transcript_segments(filename):
+            yield format_stream_item(segment, stream_format)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+@app.route('/translate/stream', methods=['POST'])
+def translate_stream():
+    """Translate a saved transcript segment by segment, streaming results as NDJSON (or SSE)
+
+    Each item keeps its source segment's start/end. The translation is also
+    written to the subtitles folder as it goes: an .srt file when the
+    transcript has timestamps, a .txt file otherwise.
+    """
+    filename = request.form['filename']
+    lang = request.form['lang'].lower()
+    stream_format = request.form.get('format', 'ndjson')
+    if not is_plain_filename(filename):
+        return jsonify({'success': False, 'error': 'Invalid file name'}), 400
+    if lang not in LANGUAGES:
+        return jsonify({'success': False, 'error': f"Unsupported language: {lang}"}), 400
+    if not os.path.exists(os.path.join(app.config['SUBTITLE_FOLDER'], filename)):
+        return jsonify({'success': False, 'error': 'File not found'}), 404
+    
+    timed = os.path.exists(get_segments_path(filename))
+    out_file = f"{os.path.splitext(filename)[0]}.{lang}{'.srt' if timed else '.txt'}"
+    out_path = os.path.join(app.config['SUBTITLE_FOLDER'], out_file)
+    # Unique per request so concurrent translations of the same file don't share it
+    part_path = f"{out_path}.{uuid.uuid4().hex[:8]}.part"
+    
+    def generate():
+        log_to_console(f"Translating {filename} to {lang}")
+        try:
+            with open(part_path, 'w', encoding='utf-8') as f:
+                for segment in translate_segments(iter_transcript_segments(filename), lang):
+                    if timed:
+                        f.write(f"{segment['index'] + 1}\n"
+                                f"{format_srt_time(segment['start'])} --> {format_srt_time(segment['end'])}\n"
+                                f"{segment['translated']}\n\n")
+                    else:
+                        f.write(segment['translated'] + '\n')
+                    yield format_stream_item(segment, stream_format)
+            os.replace(part_path, out_path)
+            log_to_console(f"Translation complete: {out_file}")
+            yield format_stream_item({'done': True, 'file': out_file}, stream_format)
+        except Exception as e:
+            log_to_console(f"Translation failed: {str(e)}")
+            yield format_stream_item({'error': str(e)}, stream_format)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 @app.route('/translate', methods=['POST'])
 def translate():
     text = request.form['text']
@@ -281,6 +1189,34 @@ def translate():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload runtime settings, optionally writing new values to the runtime config file first"""
+    token = app.config['ADMIN_TOKEN']
+    if token:
+        if request.headers.get('X-Admin-Token') != token:
+            return jsonify({'success': False, 'error': 'Invalid admin token'}), 403
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        # Without a token only local callers may change settings
+        return jsonify({'success': False, 'error': 'Set ADMIN_TOKEN to reload settings remotely'}), 403
+    
+    updates = request.get_json(silent=True) or {}
+    path = app.config['RUNTIME_CONFIG_FILE']
+    try:
+        if updates:
+            with runtime_config_lock:
+                overrides = read_runtime_overrides(config_class)
+                overrides.update(updates)
+                # Validate before writing so a bad value never reaches the file
+                apply_runtime_overrides(config_class, overrides)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(overrides, f, indent=2)
+        changed = reload_runtime_config()
+        return jsonify({'success': True, 'changed': sorted(changed)})
+    except Exception as e:
+        log_to_console(f"Runtime config reload failed: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/api/files')
 def api_files():
     """API endpoint to get list of files"""
@@ -306,19 +1242,21 @@ def transcribe_file():
     file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
     if not os.path.exists(file_path):
         return jsonify({'success': False, 'error': 'File not found'}), 404
+    spans = []
     try:
         log_to_console(f"Transcribing file: {filename}")
-        result = model.transcribe(file_path)
-        text = result['text'].strip()
+        text, segments, metadata = transcribe_media(file_path, spans)
+        if text is None:
+            return jsonify({'success': False, 'error': 'No speech detected (music only?)',
+                            'language': metadata['language'], 'spans': spans})
         sub_file = filename.rsplit('.', 1)[0] + '.txt'
-        sub_path = os.path.join(app.config['SUBTITLE_FOLDER'], sub_file)
-        with open(sub_path, 'w', encoding='utf-8') as f:
-            f.write(text)
+        save_transcript(sub_file, text, segments)
         log_to_console(f"Transcription complete: {sub_file}")
-        return jsonify({'success': True, 'content': text, 'transcript': sub_file})
+        return jsonify({'success': True, 'content': text, 'transcript': sub_file,
+                        'language': metadata['language'], 'spans': spans})
     except Exception as e:
         log_to_console(f"Transcription failed: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
+        return jsonify({'success': False, 'error': str(e), 'spans': spans})
 
 if __name__ == '__main__':
     print(f"🚀 Starting Jenna The Temp on {app.config['HOST']}:{app.config['PORT']}")